@@ -5,19 +5,22 @@ Oracle 23ai RAG Chatbot - Main Streamlit Application
 import os
 import time
 import logging
-import subprocess
+import numpy as np
 import streamlit as st
 from pathlib import Path
 
-from llama_index.core.llms import ChatMessage
-
 from config_loader import get_config
 from database import get_db_manager
-from chat_engine import create_chat_engine, llm_chat
 
 logger = logging.getLogger(__name__)
 
 
+@st.cache_data(ttl=60, show_spinner=False)
+def _existing_docs(db_version: int) -> frozenset:
+    """Existing document names, cached until db_version is bumped"""
+    return frozenset(get_db_manager().get_existing_documents())
+
+
 class ChatbotApp:
     """Main Chatbot Application"""
     
@@ -54,23 +57,34 @@ class ChatbotApp:
             "question_count": 0,
             "similarity": self.config.rag.similarity_threshold,
             "select_model": self.config.generation_model.default_model,
-            "chat_history": [],
             "enable_rag": True,
+            "db_version": 0,
         }
         
         for key, value in defaults.items():
-            if key not in st.session_state:
-                st.session_state[key] = value
+            st.session_state.setdefault(key, value)
     
     def reset_conversation(self):
         """Reset chat conversation"""
         st.session_state.messages = []
-        st.session_state.chat_history = []
         st.session_state.question_count = 0
         
         if st.session_state.enable_rag and 'chat_engine' in st.session_state:
             st.session_state.chat_engine.reset()
     
+    def append_message(self, role: str, content: str):
+        """Append a chat message, keeping the history bounded"""
+        import sys
+
+        # Intern the role so thousands of turns share one "user"/"assistant"
+        st.session_state.messages.append({"role": sys.intern(role), "content": content})
+
+        # The LLM memory is already bounded by ChatMemoryBuffer; cap the
+        # display history too so session state stops growing unbounded
+        max_messages = self.config.ui.get('max_history_messages', 200)
+        if len(st.session_state.messages) > max_messages:
+            del st.session_state.messages[:-max_messages]
+
     def save_uploaded_file(self, uploaded_file) -> Path:
         """Save uploaded file to upload directory"""
         file_path = self.upload_dir / uploaded_file.name
@@ -80,6 +94,8 @@ class ChatbotApp:
     
     def process_rag_query(self, question: str):
         """Process query with RAG"""
+        from chat_engine import get_chat_engine_manager, run_rag
+
         try:
             logger.info("Processing RAG query...")
             logger.info(
@@ -93,73 +109,104 @@ class ChatbotApp:
             st.session_state.question_count += 1
             
             logger.info(f"Question #{st.session_state.question_count}: {question}")
-            
+
+            # Short-circuit on semantically similar past questions. The
+            # cache keys on the question alone, so it is only sound on
+            # the first turn: follow-ups ("tell me more") embed
+            # near-identically regardless of the conversation they
+            # depend on
+            manager = get_chat_engine_manager()
+            first_turn = not st.session_state.chat_engine.chat_history
+            query_vec = None
+            if first_turn:
+                cached_answer, query_vec = manager.lookup_cached_answer(question)
+                if cached_answer is not None:
+                    with st.chat_message("assistant"):
+                        st.markdown(cached_answer)
+                    self.append_message("assistant", cached_answer)
+                    # Keep the engine memory in step with the visible
+                    # conversation even though the engine never ran
+                    manager.record_turn(st.session_state.chat_engine, question, cached_answer)
+                    return cached_answer
+
             # Query chat engine
             if self.config.rag.stream:
                 response = st.session_state.chat_engine.stream_chat(question)
-                return self.handle_stream_response(response)
+                output = self.handle_stream_response(response)
             else:
-                response = st.session_state.chat_engine.chat(question)
-                return self.handle_response(response)
+                response = run_rag(st.session_state.chat_engine, question)
+                output = self.handle_response(response)
+
+            # Cache only first-turn answers backed by sources; the
+            # no-source fallback would otherwise pin a failure message
+            # onto every near-duplicate phrasing
+            if first_turn and self._has_valid_sources(response):
+                manager.cache_answer(query_vec, output)
+            return output
                 
         except Exception as e:
             logger.error(f"Error in RAG query: {e}")
             return f"An error occurred: {e}"
     
+    def _has_valid_sources(self, response) -> bool:
+        """True when any retrieved source clears the similarity cutoff"""
+        return any(
+            float(n.node.metadata.get("Similarity Score", 0)) >= st.session_state.similarity
+            for n in getattr(response, "source_nodes", None) or []
+        )
+
     def handle_response(self, response) -> str:
         """Handle non-streaming response"""
         output = response.response
         source_nodes = response.source_nodes
         
-        # Check for valid sources
-        has_valid_sources = False
+        # Check for valid sources with a single vectorized pass
+        mask = np.zeros(0, dtype=bool)
         if source_nodes:
-            for node in source_nodes:
-                similarity_score = float(node.node.metadata.get("Similarity Score", 0))
-                if similarity_score >= st.session_state.similarity:
-                    has_valid_sources = True
-                    break
-        
+            scores = np.fromiter(
+                (float(n.node.metadata.get("Similarity Score", 0)) for n in source_nodes),
+                dtype=np.float32,
+                count=len(source_nodes)
+            )
+            mask = scores >= st.session_state.similarity
+        has_valid_sources = bool(mask.any())
+
         # If no valid sources, show friendly message
         if not has_valid_sources:
             output = "I couldn't find relevant information in the uploaded documents. Please try rephrasing your question or upload additional documents."
-        
+
         # Display response
         with st.chat_message("assistant"):
             st.markdown(output)
-        
+
         # Add references if enabled
         if self.config.ui.get('show_references', True) and has_valid_sources:
             with st.expander("📚 View Sources"):
-                for idx, node in enumerate(source_nodes, 1):
-                    similarity = node.node.metadata.get("Similarity Score", 0)
-                    if similarity >= st.session_state.similarity:
-                        st.markdown(f"**Source {idx}** (Similarity: {similarity:.2%})")
-                        st.markdown(f"*File:* {node.node.metadata.get('file_name', 'Unknown')}")
-                        st.markdown(f"*Page:* {node.node.metadata.get('page#', 'Unknown')}")
-                        st.markdown(f"*Content:* {node.node.text[:200]}...")
-                        st.markdown("---")
+                for idx in np.nonzero(mask)[0]:
+                    node = source_nodes[idx]
+                    st.markdown(f"**Source {idx + 1}** (Similarity: {scores[idx]:.2%})")
+                    st.markdown(f"*File:* {node.node.metadata.get('file_name', 'Unknown')}")
+                    st.markdown(f"*Page:* {node.node.metadata.get('page#', 'Unknown')}")
+                    st.markdown(f"*Content:* {node.node.text[:200]}...")
+                    st.markdown("---")
         
-        st.session_state.messages.append({"role": "assistant", "content": output})
+        self.append_message("assistant", output)
         return output
     
     def handle_stream_response(self, response):
         """Handle streaming response"""
         with st.chat_message("assistant"):
-            message_placeholder = st.empty()
-            full_response = ""
-            
-            for chunk in response.response_gen:
-                full_response += chunk
-                message_placeholder.markdown(full_response + "▌")
-            
-            message_placeholder.markdown(full_response)
+            # st.write_stream handles chunk batching and incremental
+            # rendering in the framework's optimized path
+            full_response = st.write_stream(response.response_gen)
         
-        st.session_state.messages.append({"role": "assistant", "content": full_response})
+        self.append_message("assistant", full_response)
         return full_response
     
     def process_llm_query(self, question: str):
         """Process query without RAG (direct LLM)"""
+        from chat_engine import llm_chat
+
         try:
             with st.spinner("Generating response..."):
                 st.session_state.question_count += 1
@@ -170,7 +217,7 @@ class ChatbotApp:
                 with st.chat_message("assistant"):
                     st.markdown(output)
                 
-                st.session_state.messages.append({"role": "assistant", "content": output})
+                self.append_message("assistant", output)
                 return output
                 
         except Exception as e:
@@ -211,76 +258,80 @@ class ChatbotApp:
         if not isinstance(uploaded_files, list):
             uploaded_files = [uploaded_files]
         
-        existing_docs = self.db_manager.get_existing_documents()
+        existing_docs = _existing_docs(st.session_state.db_version)
+
+        # Report all duplicates in one pass
+        duplicates = {f.name for f in uploaded_files} & existing_docs
+        if duplicates:
+            st.error(
+                f"Documents already exist: {', '.join(sorted(duplicates))}. "
+                "Please try another document or begin asking questions."
+            )
+
+        new_files = [f for f in uploaded_files if f.name not in duplicates]
         uploaded_paths = []
-        
-        for uploaded_file in uploaded_files:
-            if uploaded_file.name in existing_docs:
-                st.error(
-                    f"Document {uploaded_file.name} already exists. "
-                    "Please try another document or begin asking questions."
-                )
-            else:
-                file_path = self.save_uploaded_file(uploaded_file)
-                uploaded_paths.append(file_path)
-                logger.info(f"Uploaded: {uploaded_file.name}")
-        
+
+        # Overlap the disk writes; saving is pure I/O
+        if new_files:
+            from concurrent.futures import ThreadPoolExecutor
+
+            with ThreadPoolExecutor(max_workers=min(8, len(new_files))) as executor:
+                futures = {
+                    executor.submit(self.save_uploaded_file, f): f for f in new_files
+                }
+                for future, uploaded_file in futures.items():
+                    uploaded_paths.append(future.result())
+                    logger.info(f"Uploaded: {uploaded_file.name}")
+
         if uploaded_paths:
-            self.run_document_processing(uploaded_files[-1].name)
+            self.run_document_processing(new_files[-1].name)
     
     def run_document_processing(self, last_filename: str):
-        """Run document processing script"""
-        progress_bar = st.progress(0)
+        """Run document processing in-process"""
+        import process_documents
+
         progress_text = st.empty()
-        
+        last_message = None
+
+        def on_progress(message: str):
+            # Only push phase changes to the frontend; each update is a
+            # WebSocket round-trip
+            nonlocal last_message
+            if message != last_message:
+                progress_text.text(message)
+                last_message = message
+
         try:
             with st.spinner(f"Processing {last_filename}..."):
                 logger.info("Starting document processing...")
-                
-                process = subprocess.Popen(
-                    ["python", "process_documents.py"],
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
-                )
-                
-                total_steps = 100
-                current_step = 0
-                
-                while process.poll() is None:
-                    output = process.stdout.readline()
-                    if output:
-                        current_step += 1
-                        progress = min(current_step / total_steps, 1.0)
-                        progress_bar.progress(progress)
-                        progress_text.text(output.strip())
-                        time.sleep(0.1)
-                
-                # Read remaining output
-                for output in process.stdout:
-                    if output:
-                        current_step += 1
-                        progress = min(current_step / total_steps, 1.0)
-                        progress_bar.progress(progress)
-                        progress_text.text(output.strip())
-                
-                stdout, stderr = process.communicate()
-                
-                if process.returncode == 0:
-                    progress_bar.progress(1.0)
-                    progress_text.text("✅ Processing complete! Ready to answer questions.")
+
+                # Run on the script thread: Streamlit elements need its
+                # ScriptRunContext, and the script would only block on a
+                # worker's result anyway
+                summary = process_documents.process(on_progress)
+
+                if summary.get("errors"):
+                    st.error(f"Processing finished with {summary['errors']} errors")
+                    logger.error(f"Processing finished with errors: {summary}")
                 else:
-                    st.error(f"Processing failed: {stderr}")
-                    logger.error(f"Processing failed: {stderr}")
-                    
-        except subprocess.CalledProcessError as e:
+                    progress_text.text("✅ Processing complete! Ready to answer questions.")
+
+                # Invalidate the cached existing-documents set and the
+                # semantic response cache: answers cached before this
+                # upload rest on the old document set
+                st.session_state.db_version += 1
+
+                from chat_engine import get_chat_engine_manager
+                get_chat_engine_manager().clear_answer_cache()
+
+        except Exception as e:
             st.error(f"Error processing document: {e}")
             logger.error(f"Error processing document: {e}")
     
     def display_chat_messages(self):
         """Display chat message history"""
-        for message in st.session_state.messages:
+        max_display = self.config.ui.get('max_display_messages', 50)
+        for message in st.session_state.messages[-max_display:]:
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
     
@@ -300,12 +351,10 @@ class ChatbotApp:
             on_click=self.reset_conversation
         )
         
-        # Initialize chat engine
-        if "messages" not in st.session_state:
-            self.reset_conversation()
-        
         # Create chat engine only once
         if st.session_state.enable_rag and 'chat_engine' not in st.session_state:
+            from chat_engine import create_chat_engine
+
             with st.spinner("Initializing chat engine..."):
                 st.session_state.chat_engine, st.session_state.token_counter = create_chat_engine(
                     verbose=False,
@@ -331,8 +380,7 @@ class ChatbotApp:
         if question:
             # Display user message
             st.chat_message("user").markdown(question)
-            st.session_state.messages.append({"role": "user", "content": question})
-            st.session_state.chat_history.append(ChatMessage(role="user", content=question))
+            self.append_message("user", question)
             
             # Process based on mode
             if st.session_state.enable_rag:
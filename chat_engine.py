@@ -3,84 +3,267 @@ Chat Engine Module
 Creates and manages RAG chat engine with LLM and vector store
 """
 import os
+import asyncio
 import logging
-import streamlit as st
-from tokenizers import Tokenizer
+import threading
+from collections import OrderedDict
+from pathlib import Path
 
-from llama_index.core import VectorStoreIndex, Settings
-from llama_index.core.callbacks import CallbackManager, TokenCountingHandler
-from llama_index.core.memory import ChatMemoryBuffer
-from llama_index.llms.oci_genai import OCIGenAI
-from llama_index.embeddings.oci_genai import OCIGenAIEmbeddings
-from llama_index.postprocessor.cohere_rerank import CohereRerank
-from llama_index.core.llms import ChatMessage
+import numpy as np
+import streamlit as st
 
 from config_loader import get_config
-from oracle_vectorstore import OracleVectorStore
+from database import get_db_manager
 from oci_utils import load_oci_config, print_configuration
 
+# llama-index, tokenizers, and the OCI SDK parse thousands of files on
+# import; they are imported inside the cached builders so Streamlit
+# reruns only pay that cost once per worker process
+
 logger = logging.getLogger(__name__)
 
+# Query embeddings double as semantic-cache probes and retrieval inputs;
+# memoizing the last few means each question is embedded once per turn
+# even though the cache lookup and the retriever both ask for it
+_query_embed_memo: "OrderedDict[str, list]" = OrderedDict()
+_QUERY_EMBED_MEMO_MAX = 32
+
+
+def _remember_query_embedding(query: str, embedding):
+    _query_embed_memo[query] = embedding
+    while len(_query_embed_memo) > _QUERY_EMBED_MEMO_MAX:
+        _query_embed_memo.popitem(last=False)
+
+
+@st.cache_resource(show_spinner=False)
+def _build_embed_model() -> "OCIGenAIEmbeddings":
+    """Build the OCI embedding model once per worker process"""
+    from llama_index.embeddings.oci_genai import OCIGenAIEmbeddings
+
+    config = get_config()
+    embed_config = config.embedding_model
+
+    class MemoizedOCIGenAIEmbeddings(OCIGenAIEmbeddings):
+        """OCI embeddings with query-embedding memoization"""
+
+        def get_query_embedding(self, query: str):
+            embedding = _query_embed_memo.get(query)
+            if embedding is None:
+                embedding = super().get_query_embedding(query)
+                _remember_query_embedding(query, embedding)
+            return embedding
+
+        async def aget_query_embedding(self, query: str):
+            embedding = _query_embed_memo.get(query)
+            if embedding is None:
+                embedding = await super().aget_query_embedding(query)
+                _remember_query_embedding(query, embedding)
+            return embedding
+
+    embed_model = MemoizedOCIGenAIEmbeddings(
+        auth_profile=config.oci.profile_name,
+        compartment_id=config.oci.compartment_ocid,
+        model_name=embed_config.model_name,
+        truncate=embed_config.truncate,
+        service_endpoint=config.oci.endpoint,
+    )
+
+    logger.info(f"Created embedding model: {embed_config.model_name}")
+    return embed_model
+
+
+@st.cache_resource(show_spinner=False)
+def _build_llm(model_name: str) -> "OCIGenAI":
+    """Build an OCI LLM client once per model name"""
+    from llama_index.llms.oci_genai import OCIGenAI
+
+    config = get_config()
+
+    llm = OCIGenAI(
+        model=model_name,
+        service_endpoint=config.oci.endpoint,
+        compartment_id=config.oci.compartment_ocid,
+        auth_profile=config.oci.profile_name,
+        context_size=config.generation_model.context_size
+    )
+
+    logger.info(f"Created LLM: {model_name}")
+    return llm
+
+
+@st.cache_resource(show_spinner=False)
+def _build_reranker(top_n: int):
+    """Build the Cohere reranker once per top_n"""
+    from llama_index.postprocessor.cohere_rerank import CohereRerank
+
+    config = get_config()
+
+    reranker = CohereRerank(
+        api_key=config.reranker.api_key,
+        top_n=top_n
+    )
+
+    logger.info(f"Created reranker with top_n={top_n}")
+    return reranker
+
+
+@st.cache_resource(show_spinner=False)
+def _build_tokenizer(name: str) -> "Tokenizer":
+    """Load a pretrained tokenizer once per name"""
+    from tokenizers import Tokenizer
+
+    tokenizer = Tokenizer.from_pretrained(name)
+    tokenizer.enable_truncation(max_length=get_config().generation_model.context_size)
+    return tokenizer
+
+
+def _batched_encode(tokenizer):
+    """
+    Wrap a tokenizer in a callable that batches when given a list
+
+    encode_batch releases the GIL and parallelizes in the tokenizer's
+    Rust thread pool, unlike repeated single encodes.
+    """
+    def _encode(texts):
+        if isinstance(texts, str):
+            return tokenizer.encode(texts).ids
+        return [encoding.ids for encoding in tokenizer.encode_batch(texts)]
+
+    return _encode
+
 
 class ChatEngineManager:
     """Manages chat engine creation and configuration"""
-    
+
     def __init__(self):
         self.config = get_config()
         self.oci_config = load_oci_config()
-    
-    def create_embedding_model(self) -> OCIGenAIEmbeddings:
+        self.db_manager = get_db_manager()
+
+        # Semantic response cache: L2-normalized query embeddings plus
+        # the answers generated for them
+        self._qcache_vecs = None
+        self._qcache_answers = []
+        self._qcache_threshold = self.config.features.get('semantic_cache_threshold', 0.97)
+        self._qcache_path = self._query_cache_path()
+        self._load_query_cache()
+
+        # LLM clients keyed by model name; avoids rebuilding the HTTP
+        # session and signer per turn in non-RAG mode
+        self._llm_cache = {}
+
+    def _query_cache_path(self) -> Path:
+        """Cache file path keyed by embedding model name"""
+        model_slug = self.config.embedding_model.model_name.replace("/", "_")
+        return Path(f"data/qcache_{model_slug}.npz")
+
+    def _load_query_cache(self):
+        """Load the persisted semantic response cache, if any"""
+        try:
+            if self._qcache_path.exists():
+                cached = np.load(self._qcache_path, allow_pickle=True)
+                self._qcache_vecs = cached["vecs"]
+                self._qcache_answers = list(cached["answers"])
+                logger.info(f"Loaded {len(self._qcache_answers)} cached responses")
+        except Exception as e:
+            logger.warning(f"Could not load query cache: {e}")
+            self._qcache_vecs = None
+            self._qcache_answers = []
+
+    def _save_query_cache(self):
+        """Persist the semantic response cache to disk"""
+        try:
+            self._qcache_path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez(
+                self._qcache_path,
+                vecs=self._qcache_vecs,
+                answers=np.array(self._qcache_answers, dtype=object)
+            )
+        except Exception as e:
+            logger.warning(f"Could not persist query cache: {e}")
+
+    def lookup_cached_answer(self, question: str):
+        """
+        Probe the semantic response cache for a near-duplicate question
+
+        Returns:
+            tuple: (cached answer or None, normalized query embedding)
+        """
+        embedding = self.create_embedding_model().get_query_embedding(question)
+        query_vec = np.asarray(embedding, dtype=np.float32)
+        query_vec /= np.linalg.norm(query_vec) or 1.0
+
+        if self._qcache_vecs is not None and len(self._qcache_answers) > 0:
+            scores = self._qcache_vecs @ query_vec
+            best = int(np.argmax(scores))
+            if scores[best] > self._qcache_threshold:
+                logger.info(f"Semantic cache hit (similarity={scores[best]:.4f})")
+                return self._qcache_answers[best], query_vec
+
+        return None, query_vec
+
+    def cache_answer(self, query_vec: np.ndarray, answer: str):
+        """Store a generated answer keyed by its query embedding"""
+        if self._qcache_vecs is None:
+            self._qcache_vecs = query_vec[np.newaxis, :]
+        else:
+            self._qcache_vecs = np.vstack([self._qcache_vecs, query_vec])
+        self._qcache_answers.append(answer)
+        self._save_query_cache()
+
+    @staticmethod
+    def record_turn(chat_engine, question: str, answer: str):
+        """
+        Append a served turn to the engine's memory
+
+        Cache hits never reach the engine, so without this its history
+        would silently diverge from the conversation the user sees.
+        """
+        from llama_index.core.llms import ChatMessage, MessageRole
+
+        memory = getattr(chat_engine, "_memory", None)
+        if memory is None:
+            return
+        memory.put(ChatMessage(role=MessageRole.USER, content=question))
+        memory.put(ChatMessage(role=MessageRole.ASSISTANT, content=answer))
+
+    def clear_answer_cache(self):
+        """Drop cached answers; they may rest on a stale document set"""
+        self._qcache_vecs = None
+        self._qcache_answers = []
+        try:
+            self._qcache_path.unlink()
+        except OSError:
+            pass
+        logger.info("Semantic response cache cleared")
+
+    def create_embedding_model(self) -> "OCIGenAIEmbeddings":
         """Create embedding model"""
-        embed_config = self.config.embedding_model
-        
-        embed_model = OCIGenAIEmbeddings(
-            auth_profile=self.config.oci.profile_name,
-            compartment_id=self.config.oci.compartment_ocid,
-            model_name=embed_config.model_name,
-            truncate=embed_config.truncate,
-            service_endpoint=self.config.oci.endpoint,
-        )
-        
-        logger.info(f"Created embedding model: {embed_config.model_name}")
-        return embed_model
-    
-    def create_llm(self, model_name: str = None) -> OCIGenAI:
+        return _build_embed_model()
+
+    def create_llm(self, model_name: str = None) -> "OCIGenAI":
         """Create LLM instance"""
-        gen_config = self.config.generation_model
-        
         if model_name is None:
             # Get from session state or use default
             if hasattr(st, 'session_state') and 'select_model' in st.session_state:
                 model_name = st.session_state['select_model']
             else:
-                model_name = gen_config.default_model
-        
-        llm = OCIGenAI(
-            model=model_name,
-            service_endpoint=self.config.oci.endpoint,
-            compartment_id=self.config.oci.compartment_ocid,
-            auth_profile=self.config.oci.profile_name,
-            context_size=gen_config.context_size
-        )
-        
-        logger.info(f"Created LLM: {model_name}")
+                model_name = self.config.generation_model.default_model
+
+        llm = self._llm_cache.get(model_name)
+        if llm is None:
+            llm = self._llm_cache[model_name] = _build_llm(model_name)
         return llm
-    
+
     def create_reranker(self, top_n: int = None):
         """Create reranker if enabled"""
         if not self.config.reranker.enabled:
             return None
-        
+
         if top_n is None:
             top_n = self.config.rag.top_n
-        
-        reranker = CohereRerank(
-            api_key=self.config.reranker.api_key,
-            top_n=top_n
-        )
-        
-        logger.info(f"Created reranker with top_n={top_n}")
-        return reranker
+
+        return _build_reranker(top_n)
     
     def create_chat_engine(
         self,
@@ -105,6 +288,12 @@ class ChatEngineManager:
         Returns:
             tuple: (chat_engine, token_counter)
         """
+        from llama_index.core import VectorStoreIndex, Settings
+        from llama_index.core.callbacks import CallbackManager, TokenCountingHandler
+        from llama_index.core.memory import ChatMemoryBuffer
+
+        from oracle_vectorstore import OracleVectorStore
+
         logger.info("Creating chat engine...")
         print_configuration()
         
@@ -137,25 +326,36 @@ class ChatEngineManager:
         embed_model = self.create_embedding_model()
         vector_store = OracleVectorStore(
             verbose=verbose,
-            enable_hnsw_indexes=self.config.rag.enable_approximate
+            enable_hnsw_indexes=self.config.rag.enable_approximate,
+            db_manager=self.db_manager
         )
         llm = self.create_llm()
         
         # Initialize tokenizer and token counter
-        tokenizer = Tokenizer.from_pretrained(self.config.embedding_model.tokenizer)
-        if token_counter is None:
-            token_counter = TokenCountingHandler(tokenizer=tokenizer.encode)
-        
+        tokenizer = _build_tokenizer(self.config.embedding_model.tokenizer)
+        encode_fn = _batched_encode(tokenizer)
+
+        # Token counting dispatches a callback per retrieved node and per
+        # streamed chunk; skip it entirely when disabled
+        token_counting = self.config.observability.get('token_counting', True)
+        if token_counter is None and token_counting:
+            token_counter = TokenCountingHandler(tokenizer=encode_fn)
+
         # Configure settings
         Settings.embed_model = embed_model
         Settings.llm = llm
-        Settings.callback_manager = CallbackManager([token_counter])
+        Settings.callback_manager = CallbackManager(
+            [token_counter] if token_counter is not None else []
+        )
         
         # Create index and memory
         index = VectorStoreIndex.from_vector_store(vector_store=vector_store)
+
+        # Expose the retriever so retrieval can be awaited without synthesis
+        self.retriever = index.as_retriever(similarity_top_k=top_k)
         memory = ChatMemoryBuffer.from_defaults(
             token_limit=self.config.rag.memory_token_limit,
-            tokenizer_fn=tokenizer.encode
+            tokenizer_fn=encode_fn
         )
         
         # Setup node postprocessors
@@ -175,8 +375,24 @@ class ChatEngineManager:
             system_prompt=self.config.rag.system_prompt,
         )
         
+        # Warm the OCI endpoints in the background so the first real
+        # query only pays the inference path, not TLS + auth cold start
+        self._warm_endpoints(embed_model, llm)
+
         logger.info("Chat engine created successfully")
         return chat_engine, token_counter
+
+    def _warm_endpoints(self, embed_model, llm):
+        """Fire tiny warmup requests at the embed and generation endpoints"""
+        def _warmup():
+            try:
+                embed_model.get_query_embedding("warmup")
+                llm.complete("hi", max_tokens=1)
+                logger.info("OCI endpoints warmed")
+            except Exception as e:
+                logger.debug(f"Endpoint warmup failed: {e}")
+
+        threading.Thread(target=_warmup, daemon=True).start()
     
     def llm_chat(self, question: str, model_name: str = None) -> str:
         """
@@ -189,8 +405,10 @@ class ChatEngineManager:
         Returns:
             LLM response
         """
+        from llama_index.core.llms import ChatMessage
+
         logger.info("Calling LLM chat (no RAG)...")
-        
+
         llm = self.create_llm(model_name)
         response = llm.chat([ChatMessage(role="user", content=question)])
         
@@ -198,6 +416,32 @@ class ChatEngineManager:
         return response.message.content
 
 
+async def _arun_rag(chat_engine, question):
+    """
+    Run RAG queries on the event loop
+
+    Accepts a single question or a list of rephrased sub-queries; lists
+    are fanned out concurrently so the OCI embedding calls and Oracle
+    retrievals overlap instead of serializing. The OCI GenAI LLM
+    integration raises NotImplementedError from achat, so each query
+    runs the sync engine in a worker thread rather than awaiting it.
+    """
+    if isinstance(question, (list, tuple)):
+        return await asyncio.gather(
+            *(asyncio.to_thread(chat_engine.chat, q) for q in question)
+        )
+    return await asyncio.to_thread(chat_engine.chat, question)
+
+
+def run_rag(chat_engine, question):
+    """Synchronous entry point for the RAG pipeline"""
+    # A single question gains nothing from the event loop; only the
+    # fan-out path needs asyncio
+    if isinstance(question, (list, tuple)):
+        return asyncio.run(_arun_rag(chat_engine, question))
+    return chat_engine.chat(question)
+
+
 # Global instance
 _chat_engine_manager = None
 
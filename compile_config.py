@@ -0,0 +1,42 @@
+"""
+Compiled Config Cache Builder
+Pre-serializes the parsed config tree so production startup skips YAML
+
+Usage:
+    python -m compile_config [config.yaml] [config.cache]
+
+Run at build time (e.g. in the container image build). The cache holds
+the parsed tree with defaults applied but ${VAR} placeholders intact —
+no secrets land in the artifact; env resolution runs at load time. At
+startup, get_config() loads the cache in a single pickle.load when its
+content-version header matches the on-disk YAML; set FORCE_YAML_RELOAD=1
+to bypass it.
+"""
+
+import os
+import sys
+import pickle
+
+from config_loader import unresolved_raw_config, yaml_content_version
+
+
+def main(argv=None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    config_path = argv[0] if len(argv) > 0 else "config.yaml"
+    cache_path = argv[1] if len(argv) > 1 else "config.cache"
+
+    raw = unresolved_raw_config(config_path)
+    header = f"# content-version: {yaml_content_version(config_path)}\n".encode()
+
+    tmp_path = cache_path + ".tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(header)
+        pickle.dump(raw, f)
+    os.replace(tmp_path, cache_path)
+
+    print(f"Compiled {config_path} -> {cache_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,6 +4,10 @@ Handles loading and validation of configuration from YAML and environment variab
 """
 
 import os
+import copy
+import pickle
+import struct
+import hashlib
 import yaml
 import logging
 from pathlib import Path
@@ -11,10 +15,145 @@ from typing import Any, Dict
 from dataclasses import dataclass
 from dotenv import load_dotenv
 
+# The libyaml C loader is ~10-20x faster than the pure-Python one
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 logger = logging.getLogger(__name__)
 
 
-@dataclass
+# Schema of known config sections with their defaults; merged into the
+# raw dict once at load so the parsers below can read keys directly
+_CONFIG_DEFAULTS = {
+    'app': {
+        'title': 'AI Assistant',
+        'page_title': 'AI Assistant',
+        'layout': 'centered',
+        'port': 8501,
+        'enable_cors': False,
+    },
+    'database': {
+        'user': 'ADMIN',
+        'password': '',
+        'dsn': '',
+        'host_ip': '',
+        'service': '',
+        'wallet': {'location': '', 'password': '', 'config_dir': ''},
+    },
+    'oci': {
+        'compartment_ocid': '',
+        'endpoint': '',
+        'profile_name': 'DEFAULT',
+    },
+    'models': {
+        'embedding': {
+            'type': 'OCI',
+            'model_name': '',
+            'tokenizer': '',
+            'truncate': 'END',
+            'bits': 64,
+            'quantization': 'none',
+        },
+        'generation': {
+            'type': 'OCI',
+            'default_model': '',
+            'available_models': [],
+            'context_size': 128000,
+        },
+        'reranker': {
+            'enabled': False,
+            'type': 'COHERE',
+            'api_key': '',
+            'model_id': '',
+        },
+    },
+    'rag': {
+        'chunking': {'enabled': True, 'chunker_type': 'sentence', 'max_chunk_size': 1000, 'chunk_overlap': 100},
+        'retrieval': {
+            'top_k': 3,
+            'top_n': 3,
+            'similarity_threshold': 0.35,
+            'enable_approximate': False,
+        },
+        'generation': {'max_tokens': 600, 'temperature': 0.1, 'stream': False},
+        'chat': {'mode': 'context', 'memory_token_limit': 3000, 'system_prompt': ''},
+    },
+    'documents': {
+        'upload_dir': 'data/unprocessed',
+        'processed_dir': 'data/processed',
+        'batch_size': 40,
+        'max_concurrent_batches': 4,
+        'max_tokens_per_batch': 8192,
+        'supported_formats': ['pdf', 'txt'],
+        'id_generation_method': 'HASH',
+    },
+    'logging': {
+        'level': 'INFO',
+        'format': '%(asctime)s - %(message)s',
+        'file': 'app.log',
+        'console': True,
+    },
+    'features': {},
+    'ui': {},
+    'observability': {},
+}
+
+
+def _apply_defaults(raw: Dict[str, Any], defaults: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively fill missing keys in raw from the defaults schema"""
+    for key, default in defaults.items():
+        if key not in raw or raw[key] is None:
+            raw[key] = copy.deepcopy(default)
+        elif isinstance(default, dict) and isinstance(raw[key], dict):
+            _apply_defaults(raw[key], default)
+    return raw
+
+
+def _collect_env_placeholders(node: Any, found: set) -> None:
+    """Collect every ${VAR} placeholder name reachable from node"""
+    if isinstance(node, dict):
+        for value in node.values():
+            _collect_env_placeholders(value, found)
+    elif isinstance(node, list):
+        for value in node:
+            _collect_env_placeholders(value, found)
+    elif isinstance(node, str) and node.startswith('${') and node.endswith('}'):
+        found.add(node[2:-1])
+
+
+def _substitute_env_vars(node: Any) -> None:
+    """Replace ${VAR} placeholders in place throughout a dict tree"""
+    env_get = os.environ.__getitem__
+    items = node.items() if isinstance(node, dict) else enumerate(node)
+    for key, value in items:
+        if isinstance(value, (dict, list)):
+            _substitute_env_vars(value)
+        elif isinstance(value, str) and value.startswith('${') and value.endswith('}'):
+            node[key] = env_get(value[2:-1])
+
+
+def _resolve_env_vars(raw: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Resolve all ${VAR} placeholders in a single pass
+
+    Presence is validated up-front so a half-parsed config never escapes:
+    every missing variable is reported in one error instead of failing
+    one at a time on first access.
+    """
+    required: set = set()
+    _collect_env_placeholders(raw, required)
+    missing = required - os.environ.keys()
+    if missing:
+        raise ValueError(
+            f"Environment variables not set: {', '.join(sorted(missing))}"
+        )
+    _substitute_env_vars(raw)
+    return raw
+
+
+@dataclass(slots=True, frozen=True)
 class DatabaseConfig:
     """Database configuration"""
     user: str
@@ -27,7 +166,7 @@ class DatabaseConfig:
     config_dir: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class OCIConfig:
     """OCI configuration"""
     compartment_ocid: str
@@ -35,7 +174,7 @@ class OCIConfig:
     profile_name: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class EmbeddingModelConfig:
     """Embedding model configuration"""
     type: str
@@ -43,9 +182,10 @@ class EmbeddingModelConfig:
     tokenizer: str
     truncate: str
     bits: int
+    quantization: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class GenerationModelConfig:
     """Generation model configuration"""
     type: str
@@ -54,7 +194,7 @@ class GenerationModelConfig:
     context_size: int
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RerankerConfig:
     """Reranker configuration"""
     enabled: bool
@@ -63,10 +203,11 @@ class RerankerConfig:
     model_id: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class RAGConfig:
     """RAG pipeline configuration"""
     chunking_enabled: bool
+    chunker_type: str
     max_chunk_size: int
     chunk_overlap: int
     top_k: int
@@ -81,17 +222,19 @@ class RAGConfig:
     system_prompt: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class DocumentConfig:
     """Document processing configuration"""
     upload_dir: str
     processed_dir: str
     batch_size: int
+    max_concurrent_batches: int
+    max_tokens_per_batch: int
     supported_formats: list
     id_generation_method: str
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LoggingConfig:
     """Logging configuration"""
     level: str
@@ -100,7 +243,7 @@ class LoggingConfig:
     console: bool
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class AppConfig:
     """Application configuration"""
     title: str
@@ -113,18 +256,26 @@ class AppConfig:
 class Config:
     """Main configuration class"""
     
-    def __init__(self, config_path: str = "config.yaml"):
+    def __init__(self, config_path: str = "config.yaml", raw: Dict[str, Any] = None):
+        """
+        Args:
+            config_path: Path to the YAML configuration file
+            raw: Pre-parsed tree with defaults applied but ${VAR}
+                placeholders unresolved (what compile_config pickles);
+                skips the file read and YAML parse when given
+        """
         # Load environment variables
         load_dotenv()
-        
+
         # Load YAML configuration
         self.config_path = Path(config_path)
-        if not self.config_path.exists():
-            raise FileNotFoundError(f"Configuration file not found: {config_path}")
-        
-        with open(self.config_path, 'r') as f:
-            self._raw_config = yaml.safe_load(f)
-        
+        if raw is None:
+            if not self.config_path.exists():
+                raise FileNotFoundError(f"Configuration file not found: {config_path}")
+            raw = _apply_defaults(self._load_raw_config() or {}, _CONFIG_DEFAULTS)
+
+        self._raw_config = _resolve_env_vars(raw)
+
         # Parse configurations
         self.app = self._parse_app_config()
         self.database = self._parse_database_config()
@@ -137,130 +288,157 @@ class Config:
         self.logging = self._parse_logging_config()
         
         # Additional settings
-        self.features = self._raw_config.get('features', {})
-        self.ui = self._raw_config.get('ui', {})
-        self.observability = self._raw_config.get('observability', {})
-    
-    def _resolve_env_var(self, value: str) -> str:
-        """Resolve environment variable placeholders like ${VAR_NAME}"""
-        if isinstance(value, str) and value.startswith('${') and value.endswith('}'):
-            env_var = value[2:-1]
-            resolved = os.getenv(env_var)
-            if resolved is None:
-                raise ValueError(f"Environment variable {env_var} not set")
-            return resolved
-        return value
+        self.features = self._raw_config['features']
+        self.ui = self._raw_config['ui']
+        self.observability = self._raw_config['observability']
     
+    def _load_raw_config(self) -> Dict[str, Any]:
+        """
+        Load the raw configuration dict
+
+        The parsed YAML is cached as a pickle next to the file, keyed by
+        the YAML's mtime, so warm starts skip the YAML parse entirely.
+        """
+        mtime = self.config_path.stat().st_mtime_ns
+        cache_path = self.config_path.with_suffix('.yaml.cache')
+        mtime_header = struct.pack('<Q', mtime)
+
+        try:
+            with open(cache_path, 'rb') as f:
+                if f.read(8) == mtime_header:
+                    return pickle.load(f)
+        except (OSError, pickle.PickleError, EOFError):
+            pass
+
+        # Binary mode lets libyaml consume the buffered stream directly
+        # without a Python-side decode pass
+        with open(self.config_path, 'rb', buffering=65536) as f:
+            raw_config = yaml.load(f, Loader=_YamlLoader)
+
+        try:
+            tmp_path = cache_path.with_suffix('.cache.tmp')
+            with open(tmp_path, 'wb') as f:
+                f.write(mtime_header + pickle.dumps(raw_config))
+            os.replace(tmp_path, cache_path)
+        except OSError as e:
+            logger.debug(f"Could not write config cache: {e}")
+
+        return raw_config
+
     def _parse_app_config(self) -> AppConfig:
         """Parse application configuration"""
-        app_cfg = self._raw_config.get('app', {})
+        app_cfg = self._raw_config['app']
         return AppConfig(
-            title=app_cfg.get('title', 'AI Assistant'),
-            page_title=app_cfg.get('page_title', 'AI Assistant'),
-            layout=app_cfg.get('layout', 'centered'),
-            port=app_cfg.get('port', 8501),
-            enable_cors=app_cfg.get('enable_cors', False)
+            title=app_cfg['title'],
+            page_title=app_cfg['page_title'],
+            layout=app_cfg['layout'],
+            port=app_cfg['port'],
+            enable_cors=app_cfg['enable_cors']
         )
-    
+
     def _parse_database_config(self) -> DatabaseConfig:
         """Parse database configuration"""
-        db_cfg = self._raw_config.get('database', {})
-        wallet_cfg = db_cfg.get('wallet', {})
-        
+        db_cfg = self._raw_config['database']
+        wallet_cfg = db_cfg['wallet']
+
         return DatabaseConfig(
-            user=db_cfg.get('user', 'ADMIN'),
-            password=self._resolve_env_var(db_cfg.get('password', '')),
-            dsn=db_cfg.get('dsn', ''),
-            host_ip=db_cfg.get('host_ip', ''),
-            service=db_cfg.get('service', ''),
-            wallet_location=wallet_cfg.get('location', ''),
-            wallet_password=self._resolve_env_var(wallet_cfg.get('password', '')),
-            config_dir=wallet_cfg.get('config_dir', '')
+            user=db_cfg['user'],
+            password=db_cfg['password'],
+            dsn=db_cfg['dsn'],
+            host_ip=db_cfg['host_ip'],
+            service=db_cfg['service'],
+            wallet_location=wallet_cfg['location'],
+            wallet_password=wallet_cfg['password'],
+            config_dir=wallet_cfg['config_dir']
         )
-    
+
     def _parse_oci_config(self) -> OCIConfig:
         """Parse OCI configuration"""
-        oci_cfg = self._raw_config.get('oci', {})
+        oci_cfg = self._raw_config['oci']
         return OCIConfig(
-            compartment_ocid=self._resolve_env_var(oci_cfg.get('compartment_ocid', '')),
-            endpoint=oci_cfg.get('endpoint', ''),
-            profile_name=oci_cfg.get('profile_name', 'DEFAULT')
+            compartment_ocid=oci_cfg['compartment_ocid'],
+            endpoint=oci_cfg['endpoint'],
+            profile_name=oci_cfg['profile_name']
         )
-    
+
     def _parse_embedding_model_config(self) -> EmbeddingModelConfig:
         """Parse embedding model configuration"""
-        embed_cfg = self._raw_config.get('models', {}).get('embedding', {})
+        embed_cfg = self._raw_config['models']['embedding']
         return EmbeddingModelConfig(
-            type=embed_cfg.get('type', 'OCI'),
-            model_name=embed_cfg.get('model_name', ''),
-            tokenizer=embed_cfg.get('tokenizer', ''),
-            truncate=embed_cfg.get('truncate', 'END'),
-            bits=embed_cfg.get('bits', 64)
+            type=embed_cfg['type'],
+            model_name=embed_cfg['model_name'],
+            tokenizer=embed_cfg['tokenizer'],
+            truncate=embed_cfg['truncate'],
+            bits=embed_cfg['bits'],
+            quantization=embed_cfg['quantization']
         )
-    
+
     def _parse_generation_model_config(self) -> GenerationModelConfig:
         """Parse generation model configuration"""
-        gen_cfg = self._raw_config.get('models', {}).get('generation', {})
+        gen_cfg = self._raw_config['models']['generation']
         return GenerationModelConfig(
-            type=gen_cfg.get('type', 'OCI'),
-            default_model=gen_cfg.get('default_model', ''),
-            available_models=gen_cfg.get('available_models', []),
-            context_size=gen_cfg.get('context_size', 128000)
+            type=gen_cfg['type'],
+            default_model=gen_cfg['default_model'],
+            available_models=gen_cfg['available_models'],
+            context_size=gen_cfg['context_size']
         )
-    
+
     def _parse_reranker_config(self) -> RerankerConfig:
         """Parse reranker configuration"""
-        rerank_cfg = self._raw_config.get('models', {}).get('reranker', {})
+        rerank_cfg = self._raw_config['models']['reranker']
         return RerankerConfig(
-            enabled=rerank_cfg.get('enabled', False),
-            type=rerank_cfg.get('type', 'COHERE'),
-            api_key=self._resolve_env_var(rerank_cfg.get('api_key', '')),
-            model_id=rerank_cfg.get('model_id', '')
+            enabled=rerank_cfg['enabled'],
+            type=rerank_cfg['type'],
+            api_key=rerank_cfg['api_key'],
+            model_id=rerank_cfg['model_id']
         )
-    
+
     def _parse_rag_config(self) -> RAGConfig:
         """Parse RAG configuration"""
-        rag_cfg = self._raw_config.get('rag', {})
-        chunking = rag_cfg.get('chunking', {})
-        retrieval = rag_cfg.get('retrieval', {})
-        generation = rag_cfg.get('generation', {})
-        chat = rag_cfg.get('chat', {})
-        
+        rag_cfg = self._raw_config['rag']
+        chunking = rag_cfg['chunking']
+        retrieval = rag_cfg['retrieval']
+        generation = rag_cfg['generation']
+        chat = rag_cfg['chat']
+
         return RAGConfig(
-            chunking_enabled=chunking.get('enabled', True),
-            max_chunk_size=chunking.get('max_chunk_size', 1000),
-            chunk_overlap=chunking.get('chunk_overlap', 100),
-            top_k=retrieval.get('top_k', 3),
-            top_n=retrieval.get('top_n', 3),
-            similarity_threshold=retrieval.get('similarity_threshold', 0.35),
-            enable_approximate=retrieval.get('enable_approximate', False),
-            max_tokens=generation.get('max_tokens', 600),
-            temperature=generation.get('temperature', 0.1),
-            stream=generation.get('stream', False),
-            chat_mode=chat.get('mode', 'context'),
-            memory_token_limit=chat.get('memory_token_limit', 3000),
-            system_prompt=chat.get('system_prompt', '')
+            chunking_enabled=chunking['enabled'],
+            chunker_type=chunking['chunker_type'],
+            max_chunk_size=chunking['max_chunk_size'],
+            chunk_overlap=chunking['chunk_overlap'],
+            top_k=retrieval['top_k'],
+            top_n=retrieval['top_n'],
+            similarity_threshold=retrieval['similarity_threshold'],
+            enable_approximate=retrieval['enable_approximate'],
+            max_tokens=generation['max_tokens'],
+            temperature=generation['temperature'],
+            stream=generation['stream'],
+            chat_mode=chat['mode'],
+            memory_token_limit=chat['memory_token_limit'],
+            system_prompt=chat['system_prompt']
         )
-    
+
     def _parse_document_config(self) -> DocumentConfig:
         """Parse document configuration"""
-        doc_cfg = self._raw_config.get('documents', {})
+        doc_cfg = self._raw_config['documents']
         return DocumentConfig(
-            upload_dir=doc_cfg.get('upload_dir', 'data/unprocessed'),
-            processed_dir=doc_cfg.get('processed_dir', 'data/processed'),
-            batch_size=doc_cfg.get('batch_size', 40),
-            supported_formats=doc_cfg.get('supported_formats', ['pdf', 'txt']),
-            id_generation_method=doc_cfg.get('id_generation_method', 'HASH')
+            upload_dir=doc_cfg['upload_dir'],
+            processed_dir=doc_cfg['processed_dir'],
+            batch_size=doc_cfg['batch_size'],
+            max_concurrent_batches=doc_cfg['max_concurrent_batches'],
+            max_tokens_per_batch=doc_cfg['max_tokens_per_batch'],
+            supported_formats=doc_cfg['supported_formats'],
+            id_generation_method=doc_cfg['id_generation_method']
         )
-    
+
     def _parse_logging_config(self) -> LoggingConfig:
         """Parse logging configuration"""
-        log_cfg = self._raw_config.get('logging', {})
+        log_cfg = self._raw_config['logging']
         return LoggingConfig(
-            level=log_cfg.get('level', 'INFO'),
-            format=log_cfg.get('format', '%(asctime)s - %(message)s'),
-            file=log_cfg.get('file', 'app.log'),
-            console=log_cfg.get('console', True)
+            level=log_cfg['level'],
+            format=log_cfg['format'],
+            file=log_cfg['file'],
+            console=log_cfg['console']
         )
     
     def setup_logging(self):
@@ -287,22 +465,86 @@ class Config:
         )
 
 
-# Global configuration instance
+def yaml_content_version(config_path) -> str:
+    """MD5 of the YAML bytes; keys the compiled config cache"""
+    with open(config_path, 'rb') as f:
+        return hashlib.md5(f.read()).hexdigest()
+
+
+def unresolved_raw_config(config_path: str) -> Dict[str, Any]:
+    """
+    Parse the YAML and apply defaults, leaving ${VAR} placeholders
+
+    This is the tree compile_config pickles: resolution happens at load
+    time, so database and API secrets never land in the build artifact.
+    """
+    with open(config_path, 'rb', buffering=65536) as f:
+        raw = yaml.load(f, Loader=_YamlLoader)
+    return _apply_defaults(raw or {}, _CONFIG_DEFAULTS)
+
+
+def load_compiled_config(config_path: str) -> "Config":
+    """
+    Load a pre-built config cache written by compile_config, if present
+
+    A deployed container ships config.cache next to config.yaml (see
+    compile_config.py); when its content-version header matches the
+    on-disk YAML, the defaults-applied tree is unpickled in one step and
+    only env-var resolution and dataclass construction run — the YAML
+    parse and schema merge are skipped. Set FORCE_YAML_RELOAD=1 to
+    ignore the cache. Returns None when no valid cache exists.
+    """
+    if os.environ.get('FORCE_YAML_RELOAD') == '1':
+        return None
+
+    cache_path = Path(config_path).with_suffix('.cache')
+    try:
+        expected = f"# content-version: {yaml_content_version(config_path)}\n".encode()
+        with open(cache_path, 'rb') as f:
+            if f.readline() == expected:
+                raw = pickle.load(f)
+                # Older caches pickled a resolved Config; ignore them
+                if isinstance(raw, dict):
+                    return Config(config_path, raw=raw)
+    except (OSError, pickle.PickleError, EOFError, AttributeError):
+        pass
+    return None
+
+
+# Global configuration instance as (mtime_ns, Config)
 _config_instance = None
 
 
+def _config_mtime(config_path: str):
+    """mtime_ns of the config file, or None if it cannot be stat'ed"""
+    try:
+        return os.stat(config_path).st_mtime_ns
+    except OSError:
+        return None
+
+
 def get_config(config_path: str = "config.yaml") -> Config:
-    """Get or create configuration instance"""
+    """
+    Get or create configuration instance
+
+    The instance is cached against the YAML file's mtime: repeat calls
+    cost one stat, and edits to the file on disk auto-invalidate.
+    """
     global _config_instance
-    if _config_instance is None:
-        _config_instance = Config(config_path)
-        _config_instance.setup_logging()
-    return _config_instance
+    mtime = _config_mtime(config_path)
+    if _config_instance is not None and _config_instance[0] == mtime:
+        return _config_instance[1]
+
+    config = load_compiled_config(config_path) or Config(config_path)
+    config.setup_logging()
+    _config_instance = (mtime, config)
+    return config
 
 
 def reload_config(config_path: str = "config.yaml") -> Config:
     """Reload configuration"""
     global _config_instance
-    _config_instance = Config(config_path)
-    _config_instance.setup_logging()
-    return _config_instance
+    config = Config(config_path)
+    config.setup_logging()
+    _config_instance = (_config_mtime(config_path), config)
+    return config
@@ -9,6 +9,10 @@ CREATE TABLE IF NOT EXISTS BOOKS (
     CREATED_AT TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Sequence used to assign BOOKS.ID on insert
+-- For an existing database, use START WITH MAX(ID)+1 instead
+CREATE SEQUENCE IF NOT EXISTS BOOKS_SEQ START WITH 1 INCREMENT BY 1 NOCACHE;
+
 -- Create CHUNKS table to store document chunks and embeddings
 CREATE TABLE IF NOT EXISTS CHUNKS (
     ID VARCHAR2(64) PRIMARY KEY,
@@ -3,6 +3,8 @@ Database Utilities Module
 Handles Oracle Database connections and operations
 """
 
+import array
+import numpy as np
 import oracledb
 import logging
 from typing import Optional, List, Tuple
@@ -11,6 +13,10 @@ from config_loader import get_config
 
 logger = logging.getLogger(__name__)
 
+# Return CLOBs as plain strings in the initial fetch; streaming a LOB
+# locator costs an extra round-trip per row
+oracledb.defaults.fetch_lobs = False
+
 
 class DatabaseManager:
     """Manages Oracle Database connections and operations"""
@@ -18,21 +24,47 @@ class DatabaseManager:
     def __init__(self):
         self.config = get_config()
         self.db_config = self.config.database
-    
+
+        # Vector dtype is fixed by the embedding model config; resolve
+        # it once instead of on every save/query
+        self.np_dtype = np.float64 if self.config.embedding_model.bits == 64 else np.float32
+        self.quantize_int8 = self.config.embedding_model.quantization == 'int8'
+
+        # oracledb binds VECTOR from array.array, not ndarray; the
+        # typecode must match the dtype prepare_vectors produces
+        if self.quantize_int8:
+            self.vector_typecode = 'b'
+        else:
+            self.vector_typecode = 'd' if self.np_dtype is np.float64 else 'f'
+
+        # Bumped whenever new chunks commit; caches of query results
+        # key on it so in-process ingestion invalidates them
+        self.data_version = 0
+
+        # Connection setup (wallet TLS handshake + auth) costs hundreds
+        # of ms; pool connections once and hand them out per query
+        self._pool = oracledb.create_pool(
+            user=self.db_config.user,
+            password=self.db_config.password,
+            dsn=self.db_config.dsn,
+            config_dir=self.db_config.config_dir,
+            wallet_location=self.db_config.wallet_location,
+            wallet_password=self.db_config.wallet_password,
+            min=2,
+            max=10,
+            increment=1,
+            getmode=oracledb.POOL_GETMODE_WAIT,
+            stmtcachesize=40
+        )
+        logger.info("Database connection pool created")
+
     @contextmanager
     def get_connection(self):
         """Get database connection context manager"""
         connection = None
         try:
-            connection = oracledb.connect(
-                user=self.db_config.user,
-                password=self.db_config.password,
-                dsn=self.db_config.dsn,
-                config_dir=self.db_config.config_dir,
-                wallet_location=self.db_config.wallet_location,
-                wallet_password=self.db_config.wallet_password
-            )
-            logger.info("Database connection established")
+            connection = self._pool.acquire()
+            logger.debug("Database connection acquired from pool")
             yield connection
         except oracledb.Error as e:
             logger.error(f"Database connection error: {e}")
@@ -40,11 +72,44 @@ class DatabaseManager:
         finally:
             if connection:
                 try:
-                    connection.close()
-                    logger.debug("Database connection closed")
+                    self._pool.release(connection)
+                    logger.debug("Database connection released to pool")
                 except Exception as e:
-                    logger.error(f"Error closing connection: {e}")
+                    logger.error(f"Error releasing connection: {e}")
+
+    def close(self):
+        """Close the connection pool"""
+        self._pool.close()
+        logger.info("Database connection pool closed")
     
+    def prepare_vectors(self, vectors) -> np.ndarray:
+        """
+        Convert embeddings to the configured storage dtype
+
+        With int8 quantization each vector is scaled to its own max and
+        rounded, a 4-8x size cut versus float. No scale is stored:
+        cosine distance is invariant to per-vector scaling, so quantized
+        rows compare correctly against a quantized query. Accepts one
+        vector or a 2D batch; rows go through to_vector at bind time.
+        """
+        if self.quantize_int8:
+            arr = np.asarray(vectors, dtype=np.float64)
+            scales = np.abs(arr).max(axis=-1, keepdims=True)
+            scales[scales == 0] = 1.0
+            return np.clip(np.rint(arr * (127.0 / scales)), -128, 127).astype(np.int8)
+        return np.asarray(vectors, dtype=self.np_dtype)
+
+    def to_vector(self, vector: np.ndarray) -> array.array:
+        """
+        Convert one prepared vector to the VECTOR bind type
+
+        oracledb's bind inference only maps array.array to
+        DB_TYPE_VECTOR and raises DPY-3002 for ndarrays, so every vector
+        crosses this boundary right before execute/executemany. The
+        bytes go through one C-level copy, no per-element iteration.
+        """
+        return array.array(self.vector_typecode, vector.tobytes())
+
     def get_existing_documents(self) -> set:
         """Get list of existing document names from database"""
         try:
@@ -58,22 +123,35 @@ class DatabaseManager:
             logger.error(f"Error fetching existing documents: {e}")
             return set()
     
+    def get_existing_chunk_ids(self) -> set:
+        """Get the set of chunk IDs already stored in the database"""
+        try:
+            with self.get_connection() as connection:
+                cursor = connection.cursor()
+                cursor.arraysize = 10000
+                cursor.execute("SELECT id FROM chunks")
+                chunk_ids = {row[0] for row in cursor.fetchall()}
+                cursor.close()
+                return chunk_ids
+        except oracledb.Error as e:
+            logger.error(f"Error fetching existing chunk IDs: {e}")
+            return set()
+
     def register_document(self, document_name: str) -> int:
         """Register a new document in the database"""
         try:
             with self.get_connection() as connection:
                 cursor = connection.cursor()
-                
-                # Get next ID
-                cursor.execute("SELECT MAX(ID) FROM BOOKS")
-                row = cursor.fetchone()
-                new_id = (row[0] + 1) if row[0] is not None else 1
-                
-                # Insert new book
+
+                # Sequence + RETURNING: one round-trip, no MAX scan, and
+                # safe under concurrent registrations
+                new_id_var = cursor.var(int)
                 cursor.execute(
-                    "INSERT INTO BOOKS (ID, NAME) VALUES (:1, :2)",
-                    [new_id, document_name]
+                    "INSERT INTO BOOKS (ID, NAME) VALUES (BOOKS_SEQ.NEXTVAL, :1) "
+                    "RETURNING ID INTO :2",
+                    [document_name, new_id_var]
                 )
+                new_id = new_id_var.getvalue()[0]
                 connection.commit()
                 cursor.close()
                 
@@ -92,38 +170,45 @@ class DatabaseManager:
         document_id: int
     ) -> int:
         """Save document chunks and embeddings to database"""
-        import array
-        errors = 0
-        
+        # One contiguous (n, dim) array, converted row by row to the
+        # array.array bind type oracledb requires for VECTOR
+        vectors = self.prepare_vectors(embeddings)
+
+        rows = [
+            (chunk_id, text, self.to_vector(vector), page_num, document_id)
+            for chunk_id, text, page_num, vector in zip(
+                chunk_ids, chunk_texts, page_nums, vectors
+            )
+        ]
+
         try:
             with self.get_connection() as connection:
                 cursor = connection.cursor()
-                cursor.setinputsizes(None, oracledb.DB_TYPE_CLOB)
-                
-                array_type = "d" if self.config.embedding_model.bits == 64 else "f"
-                
-                for chunk_id, text, page_num, vector in zip(
-                    chunk_ids, chunk_texts, page_nums, embeddings
-                ):
-                    try:
-                        input_array = array.array(array_type, vector)
-                        cursor.execute(
-                            """INSERT INTO CHUNKS (ID, CHUNK, VEC, PAGE_NUM, BOOK_ID) 
-                               VALUES (:1, :2, :3, :4, :5)""",
-                            [chunk_id, text, input_array, page_num, document_id]
-                        )
-                    except oracledb.Error as e:
-                        logger.error(f"Error saving chunk {chunk_id}: {e}")
-                        errors += 1
-                
+                cursor.setinputsizes(None, oracledb.DB_TYPE_CLOB, None, None, None)
+
+                # One round-trip and one server-side prepared statement
+                # for the whole batch; batcherrors keeps good rows
+                cursor.executemany(
+                    """INSERT INTO CHUNKS (ID, CHUNK, VEC, PAGE_NUM, BOOK_ID)
+                       VALUES (:1, :2, :3, :4, :5)""",
+                    rows,
+                    batcherrors=True
+                )
+
+                batch_errors = cursor.getbatcherrors()
+                errors = len(batch_errors)
+                for error in batch_errors:
+                    logger.error(f"Error saving chunk at row {error.offset}: {error.message}")
+
                 connection.commit()
                 cursor.close()
-                logger.info(f"Saved {len(chunk_ids) - errors} chunks with {errors} errors")
-                
+                self.data_version += 1
+                logger.info(f"Saved {len(rows) - errors} chunks with {errors} errors")
+
         except oracledb.Error as e:
             logger.error(f"Critical error saving chunks: {e}")
             raise
-        
+
         return errors
 
 
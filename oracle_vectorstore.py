@@ -4,8 +4,10 @@ Integrates Oracle Vector DB with llama-index
 """
 
 import time
-import array
+import hashlib
 import logging
+import collections
+import numpy as np
 import streamlit as st
 from typing import List, Any, Dict
 from contextlib import contextmanager
@@ -22,30 +24,57 @@ from database import get_db_manager
 
 logger = logging.getLogger(__name__)
 
+# Resolve tracing dependencies once at import; the per-query context
+# manager only branches on the flag
+try:
+    from opentelemetry import trace as trace_api
+    from opentelemetry.trace import Status, StatusCode
+    from openinference.semconv.trace import SpanAttributes
+
+    _TRACER = trace_api.get_tracer(__name__)
+    _TRACING_AVAILABLE = True
+except ImportError:
+    _TRACING_AVAILABLE = False
+
+# The two statement variants are fixed; precomputing them avoids the
+# per-query f-string build and keeps the statement cache keys stable
+_QUERY_SQL = """
+    SELECT C.ID,
+           C.CHUNK,
+           C.PAGE_NUM,
+           VECTOR_DISTANCE(C.VEC, :embedding, COSINE) as distance,
+           B.NAME
+    FROM CHUNKS C, BOOKS B
+    WHERE C.BOOK_ID = B.ID
+      AND VECTOR_DISTANCE(C.VEC, :embedding, COSINE) <= :max_distance
+    ORDER BY distance
+    FETCH {approx_clause} FIRST :top_k ROWS ONLY
+"""
+_Q_EXACT = _QUERY_SQL.format(approx_clause="")
+_Q_APPROX = _QUERY_SQL.format(approx_clause="APPROXIMATE")
+
+# Small LRU of query results keyed by embedding hash + parameters; RAG
+# traffic has strong locality (reruns, regenerate, repeated phrasings)
+_QUERY_CACHE_MAX = 64
+_query_cache: "collections.OrderedDict[tuple, VectorStoreQueryResult]" = collections.OrderedDict()
+
 
 @contextmanager
 def optional_tracing(span_name: str):
     """Context manager for optional Phoenix tracing"""
     config = get_config()
-    phoenix_config = config.observability.get('phoenix', {})
-    
-    if phoenix_config.get('enabled', False):
-        try:
-            from opentelemetry import trace as trace_api
-            from opentelemetry.trace import Status, StatusCode
-            from openinference.semconv.trace import SpanAttributes
-            
-            tracer = trace_api.get_tracer(__name__)
-            with tracer.start_as_current_span(name=span_name) as span:
-                span.set_attribute("openinference.span.kind", "Retriever")
-                span.set_attribute(SpanAttributes.TOOL_NAME, "oracle_vector_store")
-                span.set_attribute(SpanAttributes.TOOL_DESCRIPTION, "Oracle DB 23ai")
-                span.set_status(Status(StatusCode.OK))
-                yield span
-        except ImportError:
-            logger.warning("Phoenix tracing enabled but dependencies not installed")
-            yield None
+    phoenix_enabled = config.observability.get('phoenix', {}).get('enabled', False)
+
+    if phoenix_enabled and _TRACING_AVAILABLE:
+        with _TRACER.start_as_current_span(name=span_name) as span:
+            span.set_attribute("openinference.span.kind", "Retriever")
+            span.set_attribute(SpanAttributes.TOOL_NAME, "oracle_vector_store")
+            span.set_attribute(SpanAttributes.TOOL_DESCRIPTION, "Oracle DB 23ai")
+            span.set_status(Status(StatusCode.OK))
+            yield span
     else:
+        if phoenix_enabled:
+            logger.warning("Phoenix tracing enabled but dependencies not installed")
         yield None
 
 
@@ -54,81 +83,93 @@ def oracle_query(
     top_k: int,
     similarity_threshold: float = 0.35,
     verbose: bool = False,
-    approximate: bool = False
+    approximate: bool = False,
+    db_manager=None
 ) -> VectorStoreQueryResult:
     """
     Execute vector similarity query against Oracle Database
-    
+
     Args:
         embed_query: Query embedding vector
         top_k: Number of results to return
         similarity_threshold: Minimum similarity score
         verbose: Enable verbose logging
         approximate: Use approximate (HNSW) search
-    
+        db_manager: Shared DatabaseManager; defaults to the global one
+
     Returns:
         VectorStoreQueryResult with matched chunks
     """
     start_time = time.time()
-    config = get_config()
-    db_manager = get_db_manager()
-    
+    if db_manager is None:
+        db_manager = get_db_manager()
+
+    # Prepare query vector (quantized if configured) and convert to the
+    # array.array type oracledb accepts for VECTOR binds
+    array_query = db_manager.to_vector(db_manager.prepare_vectors(embed_query))
+
+    # data_version ties entries to the chunk set they were computed
+    # against, so in-process uploads stop serving pre-upload results
+    cache_key = (
+        hashlib.blake2b(array_query.tobytes(), digest_size=16).digest(),
+        top_k,
+        similarity_threshold,
+        approximate,
+        db_manager.data_version
+    )
+    cached = _query_cache.get(cache_key)
+    if cached is not None:
+        _query_cache.move_to_end(cache_key)
+        if verbose:
+            logger.debug("Query cache hit")
+        return cached
+
     try:
         with db_manager.get_connection() as connection:
             cursor = connection.cursor()
-            
-            # Prepare query vector
-            array_type = "d" if config.embedding_model.bits == 64 else "f"
-            array_query = array.array(array_type, embed_query)
-            
-            # Build SQL query
-            approx_clause = "APPROXIMATE" if approximate else ""
-            query_sql = f"""
-                SELECT C.ID,
-                       C.CHUNK,
-                       C.PAGE_NUM,
-                       VECTOR_DISTANCE(C.VEC, :1, COSINE) as distance,
-                       B.NAME
-                FROM CHUNKS C, BOOKS B
-                WHERE C.BOOK_ID = B.ID
-                ORDER BY distance
-                FETCH {approx_clause} FIRST :2 ROWS ONLY
-            """
-            
+
+            # Size the fetch to top_k so the whole result arrives in a
+            # single round-trip; the +1 prefetch lets the end-of-data
+            # marker piggyback on the same trip
+            cursor.arraysize = max(top_k, 1)
+            cursor.prefetchrows = max(top_k, 1) + 1
+
+            # The similarity threshold is applied server-side so
+            # rejected rows never cross the network
+            query_sql = _Q_APPROX if approximate else _Q_EXACT
+
             if verbose:
                 logger.debug(f"Executing query with top_k={top_k}, threshold={similarity_threshold}")
-            
+
             # Execute query
-            cursor.execute(query_sql, [array_query, top_k])
+            cursor.execute(query_sql, {
+                "embedding": array_query,
+                "max_distance": 1 - similarity_threshold,
+                "top_k": top_k
+            })
             rows = cursor.fetchall()
-            
-            # Process results
-            result_nodes = []
-            node_ids = []
-            similarities = []
-            
-            for row in rows:
-                similarity_score = 1 - row[3]  # Convert distance to similarity
-                
-                if similarity_score >= similarity_threshold:
-                    clob_data = row[1].read()
-                    
-                    result_nodes.append(
-                        TextNode(
-                            id_=row[0],
-                            text=clob_data,
-                            metadata={
-                                "file_name": row[4],
-                                "page#": row[2],
-                                "Similarity Score": similarity_score
-                            }
-                        )
-                    )
-                    node_ids.append(row[0])
-                    similarities.append(row[3])
-                    
-                    if verbose:
-                        logger.debug(f"Added result: {row[0]}, similarity: {similarity_score:.4f}")
+
+            # Rows are already threshold-filtered server-side and CHUNK
+            # arrives as str (fetch_lobs is disabled); build the result
+            # lists in single comprehensions instead of per-row appends
+            result_nodes = [
+                TextNode(
+                    id_=row[0],
+                    text=row[1],
+                    metadata={
+                        "file_name": row[4],
+                        "page#": row[2],
+                        "Similarity Score": 1 - row[3]
+                    }
+                )
+                for row in rows
+            ]
+            node_ids = [row[0] for row in rows]
+            similarities = [row[3] for row in rows]
+
+            if verbose:
+                for row in rows:
+                    logger.debug(f"Added result: {row[0]}, similarity: {1 - row[3]:.4f}")
             
             cursor.close()
             
@@ -136,12 +177,18 @@ def oracle_query(
             if verbose:
                 logger.info(f"Query completed in {elapsed_time:.2f}s, found {len(result_nodes)} results")
             
-            return VectorStoreQueryResult(
+            result = VectorStoreQueryResult(
                 nodes=result_nodes,
                 similarities=similarities,
                 ids=node_ids
             )
-            
+
+            _query_cache[cache_key] = result
+            while len(_query_cache) > _QUERY_CACHE_MAX:
+                _query_cache.popitem(last=False)
+
+            return result
+
     except Exception as e:
         logger.error(f"Error in oracle_query: {e}")
         return VectorStoreQueryResult(nodes=[], similarities=[], ids=[])
@@ -153,18 +200,30 @@ class OracleVectorStore(VectorStore):
     stores_text: bool = True
     verbose: bool = False
     
-    def __init__(self, verbose: bool = False, enable_hnsw_indexes: bool = False):
+    def __init__(self, verbose: bool = False, enable_hnsw_indexes: bool = False, db_manager=None):
         """
         Initialize Oracle Vector Store
-        
+
         Args:
             verbose: Enable verbose logging
             enable_hnsw_indexes: Use HNSW indexes for approximate search
+            db_manager: Shared DatabaseManager; defaults to the global one
         """
         self.verbose = verbose
         self.enable_hnsw_indexes = enable_hnsw_indexes
-        self.node_dict: Dict[str, BaseNode] = {}
-        
+        self.db_manager = db_manager if db_manager is not None else get_db_manager()
+
+        # LRU-bounded node cache; nodes hold full text, so an unbounded
+        # dict leaks memory over a long-running session
+        self.node_dict: "collections.OrderedDict[str, BaseNode]" = collections.OrderedDict()
+        config = get_config()
+        self._max_nodes = config.features.get('node_cache_size', 1024)
+
+        # Config is a singleton, so retrieval defaults are bound once
+        # here instead of re-resolved on every query
+        self._default_top_k = config.rag.top_k
+        self._default_threshold = config.rag.similarity_threshold
+
         logger.info("Initialized Oracle Vector Store")
     
     def add(self, nodes: List[BaseNode]) -> List[str]:
@@ -180,10 +239,33 @@ class OracleVectorStore(VectorStore):
         ids_list = []
         for node in nodes:
             self.node_dict[node.id_] = node
+            self.node_dict.move_to_end(node.id_)
             ids_list.append(node.id_)
-        
+
+        while len(self.node_dict) > self._max_nodes:
+            self.node_dict.popitem(last=False)
+
         return ids_list
     
+    def get_nodes(self, node_ids: List[str] = None, filters: Any = None) -> List[BaseNode]:
+        """
+        Return cached nodes by ID without a database round-trip
+
+        llama-index fetches nodes by ID during postprocessing; nodes just
+        returned by query are resident in node_dict, so serving them from
+        the cache skips a follow-up text/metadata fetch.
+        """
+        if not node_ids:
+            return list(self.node_dict.values())
+
+        found = []
+        for node_id in node_ids:
+            node = self.node_dict.get(node_id)
+            if node is not None:
+                self.node_dict.move_to_end(node_id)
+                found.append(node)
+        return found
+
     def delete(self, node_id: str, **delete_kwargs: Any) -> None:
         """Delete node from index"""
         raise NotImplementedError("Delete not implemented for Oracle Vector Store")
@@ -198,15 +280,14 @@ class OracleVectorStore(VectorStore):
         Returns:
             Query results
         """
-        config = get_config()
-        
-        # Get parameters from session state or config
+        # Session state overrides win; otherwise use the defaults bound
+        # in __init__
         if hasattr(st, 'session_state') and 'top_k' in st.session_state:
             top_k = st.session_state['top_k']
-            similarity_threshold = st.session_state.get('similarity', config.rag.similarity_threshold)
+            similarity_threshold = st.session_state.get('similarity', self._default_threshold)
         else:
-            top_k = config.rag.top_k
-            similarity_threshold = config.rag.similarity_threshold
+            top_k = self._default_top_k
+            similarity_threshold = self._default_threshold
         
         if self.verbose:
             logger.info(f"Querying DB with top_k={top_k}")
@@ -217,7 +298,8 @@ class OracleVectorStore(VectorStore):
                 top_k=top_k,
                 similarity_threshold=similarity_threshold,
                 verbose=self.verbose,
-                approximate=self.enable_hnsw_indexes
+                approximate=self.enable_hnsw_indexes,
+                db_manager=self.db_manager
             )
     
     def persist(self, persist_path=None, fs=None) -> None:
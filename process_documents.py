@@ -4,12 +4,17 @@ Handles document loading, chunking, embedding, and storage
 """
 
 import os
+import re
 import logging
 import hashlib
 import time
+import mmap
 import shutil
+import queue
+import threading
 from pathlib import Path
-from typing import List, Tuple
+from typing import Iterator, List, Tuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from tqdm import tqdm
 
 import numpy as np
@@ -23,16 +28,71 @@ from config_loader import get_config
 from database import get_db_manager
 from oci_utils import load_oci_config
 
+# chonkie's single-pass recursive chunker is optional; SentenceSplitter
+# remains the default and the fallback
+try:
+    from chonkie import RecursiveChunker
+    _CHONKIE_AVAILABLE = True
+except ImportError:
+    _CHONKIE_AVAILABLE = False
+
+# PDFium extracts text in native code, an order of magnitude faster
+# than pypdf's pure-Python extractor; pypdf remains the fallback
+try:
+    import pypdfium2 as pdfium
+    _PDFIUM_AVAILABLE = True
+except ImportError:
+    _PDFIUM_AVAILABLE = False
+
+# BLAKE3 hashes several times faster than SHA-256 on machines without
+# SHA extensions; only used when id_generation_method selects it
+try:
+    from blake3 import blake3
+    _BLAKE3_AVAILABLE = True
+except ImportError:
+    _BLAKE3_AVAILABLE = False
+
 logger = logging.getLogger(__name__)
 
+# Preprocess machinery shared across calls: hyphenated line breaks are
+# stripped, remaining whitespace becomes spaces in one C-level translate
+# pass, then space runs collapse with a constant replacement — no
+# per-match Python callback anywhere. The table covers everything
+# Python's \s matches, not just ASCII: PDF extractors emit NBSP, thin
+# spaces and line/paragraph separators, and those must collapse too.
+# [ \t] because the original turned tabs into spaces before stripping
+# hyphenated breaks; the translate pass now runs after this regex
+_HYPHEN_NL = re.compile(r"[ \t]?-\n")
+_WS_CHARS = (
+    "\t\n\r\x0b\f\x1c\x1d\x1e\x1f\x85\xa0\u1680"
+    "\u2000\u2001\u2002\u2003\u2004\u2005\u2006\u2007\u2008\u2009\u200a"
+    "\u2028\u2029\u202f\u205f\u3000"
+)
+_WS_TABLE = str.maketrans(dict.fromkeys(_WS_CHARS, " "))
+_MULTISPACE = re.compile(r" {2,}")
+
+
+# Below this page count, process startup outweighs the extraction win
+_PARALLEL_PAGE_MIN = 16
+
+
+def _extract_page(args: Tuple[str, int]) -> str:
+    """Extract one page's text in a worker process"""
+    # PdfReader objects don't pickle, so each call reopens the file;
+    # the open is a cheap xref parse next to pypdf's extraction cost
+    file_path, page_num = args
+    reader = PdfReader(file_path, strict=False)
+    return reader.pages[page_num].extract_text()
+
 
 class DocumentProcessor:
     """Handles document processing pipeline"""
     
-    def __init__(self):
+    def __init__(self, progress_cb=None):
         self.config = get_config()
         self.db_manager = get_db_manager()
-        
+        self.progress_cb = progress_cb
+
         # Initialize embedding model
         self.embed_model = OCIGenAIEmbeddings(
             compartment_id=self.config.oci.compartment_ocid,
@@ -40,155 +100,321 @@ class DocumentProcessor:
             truncate=self.config.embedding_model.truncate,
             service_endpoint=self.config.oci.endpoint,
         )
-        
+
+        # Token-budget batch packing measures chunks in model tokens
+        self.tokenizer = Tokenizer.from_pretrained(self.config.embedding_model.tokenizer)
+
         logger.info("Initialized Document Processor")
+
+    def _progress(self, message: str):
+        """Report progress to the optional callback"""
+        if self.progress_cb:
+            try:
+                self.progress_cb(message)
+            except Exception as e:
+                logger.debug(f"Progress callback failed: {e}")
     
     def generate_ids(self, nodes: List[Document]) -> List[str]:
         """Generate IDs for document nodes"""
         method = self.config.documents.id_generation_method
         
-        if method == "HASH":
-            logger.debug("Generating hash-based IDs")
-            ids = []
-            for doc in tqdm(nodes, desc="Generating IDs"):
-                hash_hex = hashlib.sha256(doc.text.encode()).hexdigest()
-                ids.append(hash_hex)
-            return ids
+        if method in ("HASH", "BLAKE3"):
+            logger.debug(f"Generating {method.lower()}-based IDs")
+
+            if method == "BLAKE3":
+                if not _BLAKE3_AVAILABLE:
+                    raise ValueError("id_generation_method BLAKE3 requires the blake3 package")
+
+                def hash_text(text: str) -> str:
+                    return blake3(text.encode()).hexdigest()
+            else:
+                def hash_text(text: str) -> str:
+                    return hashlib.sha256(text.encode()).hexdigest()
+
+            # Both hashers release the GIL, so hashing threads run in
+            # parallel; map() preserves input order
+            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
+                return list(executor.map(hash_text, (doc.text for doc in nodes)))
         elif method == "LLINDEX":
             return [doc.id_ for doc in nodes]
         else:
             raise ValueError(f"Unknown ID generation method: {method}")
     
-    def load_pdf_pages(self, file_path: str) -> List[Document]:
-        """Load PDF and extract pages"""
-        pdf_reader = PdfReader(file_path)
-        pages = []
-        
-        for page_num, page in enumerate(pdf_reader.pages):
-            text = page.extract_text()
-            if text.strip():
-                pages.append(
-                    Document(
+    def _load_pdf_pages_pdfium(self, file_path: str) -> Iterator[Document]:
+        """Extract pages with PDFium's native text extractor"""
+        pdf = pdfium.PdfDocument(file_path)
+        try:
+            for page_num in range(len(pdf)):
+                page = pdf[page_num]
+                textpage = page.get_textpage()
+                text = textpage.get_text_range()
+                # Text pages and pages hold native resources
+                textpage.close()
+                page.close()
+                if text.strip():
+                    yield Document(
                         text=text,
                         metadata={"page_label": str(page_num + 1)}
                     )
-                )
-        
-        logger.info(f"Loaded {len(pages)} pages from PDF")
-        return pages
+        finally:
+            pdf.close()
+
+    def load_pdf_pages(self, file_path: str) -> Iterator[Document]:
+        """Load a PDF, yielding non-empty pages as they are extracted"""
+        if _PDFIUM_AVAILABLE:
+            yield from self._load_pdf_pages_pdfium(file_path)
+            return
+
+        # Memory-map the file so pypdf parses straight from the page
+        # cache instead of through a second userspace buffer
+        with open(file_path, 'rb') as f, \
+                mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            if hasattr(mm, 'madvise'):
+                mm.madvise(mmap.MADV_SEQUENTIAL)
+
+            pdf_reader = PdfReader(mm, strict=False)
+            num_pages = len(pdf_reader.pages)
+
+            if num_pages >= _PARALLEL_PAGE_MIN:
+                # pypdf extraction is pure Python and CPU-bound, so
+                # large PDFs fan pages out across processes
+                with ProcessPoolExecutor() as executor:
+                    texts = executor.map(
+                        _extract_page,
+                        [(file_path, i) for i in range(num_pages)],
+                        chunksize=8
+                    )
+                    for page_num, text in enumerate(texts):
+                        if text.strip():
+                            yield Document(
+                                text=text,
+                                metadata={"page_label": str(page_num + 1)}
+                            )
+            else:
+                for page_num, page in enumerate(pdf_reader.pages):
+                    text = page.extract_text()
+                    if text.strip():
+                        yield Document(
+                            text=text,
+                            metadata={"page_label": str(page_num + 1)}
+                        )
     
     def preprocess_text(self, text: str) -> str:
         """Preprocess text content"""
-        import re
-        
-        text = text.replace("\t", " ")
-        text = text.replace(" -\n", "")
-        text = text.replace("-\n", "")
-        text = text.replace("\n", " ")
-        text = re.sub(r"\s+", " ", text)
-        text = text.strip()
-        
+        text = _HYPHEN_NL.sub("", text)
+        text = text.translate(_WS_TABLE)
+        text = _MULTISPACE.sub(" ", text).strip()
         return text if text else None
     
-    def remove_short_pages(self, pages: List[Document], threshold: int = 10) -> List[Document]:
-        """Remove pages with fewer words than threshold"""
-        filtered = []
+    def preprocess_pages(self, pages: Iterator[Document]) -> Iterator[Document]:
+        """Yield preprocessed pages, dropping ones that become empty"""
+        for page in pages:
+            preprocessed_text = self.preprocess_text(page.text)
+            if preprocessed_text:
+                yield Document(text=preprocessed_text, metadata=page.metadata)
+
+    def remove_short_pages(self, pages: Iterator[Document], threshold: int = 10) -> Iterator[Document]:
+        """Yield pages with at least threshold words"""
         removed = 0
-        
+
         for page in pages:
-            if len(page.text.split()) >= threshold:
-                filtered.append(page)
+            # Space count approximates the word count without split()'s
+            # per-page token list; preprocessing has already collapsed
+            # all whitespace runs to single spaces
+            if page.text.count(' ') + 1 >= threshold:
+                yield page
             else:
                 removed += 1
-        
+
         logger.info(f"Removed {removed} short pages")
-        return filtered
     
     def process_as_pages(self, file_path: str) -> Tuple[List[str], List[str], List[str]]:
         """Process document as pages (no chunking)"""
-        pages = self.load_pdf_pages(file_path)
-        
-        # Preprocess text - create new Documents since text is immutable
-        preprocessed_pages = []
-        for page in pages:
-            preprocessed_text = self.preprocess_text(page.text)
-            if preprocessed_text:
-                preprocessed_pages.append(
-                    Document(text=preprocessed_text, metadata=page.metadata)
-                )
-        pages = preprocessed_pages
-        
-        pages = self.remove_short_pages(pages)
-        
+        # Generator pipeline: one page is in flight at a time, and only
+        # the final filtered pages are materialized
+        pages = list(self.remove_short_pages(
+            self.preprocess_pages(self.load_pdf_pages(file_path))
+        ))
+
         pages_text = [p.text for p in pages]
         pages_num = [p.metadata["page_label"] for p in pages]
         pages_id = self.generate_ids(pages)
-        
+
         return pages_text, pages_id, pages_num
     
+    def _chunk_recursive(self, pages: List[Document]) -> Tuple[List[str], List[str], List[str]]:
+        """Chunk pages with chonkie's single-pass recursive chunker"""
+        chunker = RecursiveChunker(chunk_size=self.config.rag.max_chunk_size)
+
+        # One chunker call per page so each chunk keeps its page label
+        chunks = []
+        pages_num = []
+        for page, page_chunks in zip(pages, chunker.chunk_batch([p.text for p in pages])):
+            chunks.extend(page_chunks)
+            pages_num.extend([page.metadata["page_label"]] * len(page_chunks))
+
+        nodes_text = [c.text for c in chunks]
+        nodes_id = self.generate_ids(chunks)
+
+        logger.info(f"Created {len(chunks)} chunks (recursive)")
+        return nodes_text, nodes_id, pages_num
+
     def process_as_chunks(self, file_path: str) -> Tuple[List[str], List[str], List[str]]:
         """Process document with chunking"""
+        # Generator pipeline; the chunkers need a list, so pages are
+        # materialized only at this last step
+        pages = list(self.remove_short_pages(
+            self.preprocess_pages(self.load_pdf_pages(file_path))
+        ))
+
+        chunker_type = self.config.rag.chunker_type
+        if chunker_type == "recursive":
+            if _CHONKIE_AVAILABLE:
+                return self._chunk_recursive(pages)
+            logger.warning("chunker_type 'recursive' requires chonkie; using sentence splitter")
+
         node_parser = SentenceSplitter(
             chunk_size=self.config.rag.max_chunk_size,
             chunk_overlap=self.config.rag.chunk_overlap
         )
-        
-        pages = self.load_pdf_pages(file_path)
-        
-        # Preprocess - create new Documents
-        preprocessed_pages = []
-        for page in pages:
-            preprocessed_text = self.preprocess_text(page.text)
-            if preprocessed_text and preprocessed_text.strip():
-                preprocessed_pages.append(
-                    Document(text=preprocessed_text, metadata=page.metadata)
-                )
-        pages = preprocessed_pages
-        
-        pages = self.remove_short_pages(pages)
-        
+
         # Split into chunks
         nodes = node_parser.get_nodes_from_documents(pages, show_progress=True)
-        
+
         nodes_text = [n.text for n in nodes]
         pages_num = [n.metadata.get("page_label", "unknown") for n in nodes]
         nodes_id = self.generate_ids(nodes)
-        
+
         logger.info(f"Created {len(nodes)} chunks")
         return nodes_text, nodes_id, pages_num
     
-    def compute_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Compute embeddings for texts"""
+    def _pack_batches(self, texts: List[str]) -> List[List[str]]:
+        """
+        Pack texts into embedding batches up to a token budget
+
+        A fixed batch count under-fills requests with short chunks and
+        risks truncation with long ones; greedy packing against
+        documents.max_tokens_per_batch keeps each request near the
+        budget. batch_size still caps the input count per request.
+        encode_batch runs in Rust across threads, so measuring is cheap.
+        """
+        if not texts:
+            return []
+
         batch_size = self.config.documents.batch_size
-        embeddings = []
-        
-        for i in tqdm(range(0, len(texts), batch_size), desc="Computing embeddings"):
-            batch = texts[i:i + batch_size]
-            batch_embeddings = self.embed_model.get_text_embedding_batch(batch)
-            embeddings.extend(batch_embeddings)
-            time.sleep(0.1)  # Rate limiting
-        
+        max_tokens = self.config.documents.max_tokens_per_batch
+        encodings = self.tokenizer.encode_batch(texts, add_special_tokens=False)
+
+        batches = []
+        batch = []
+        batch_tokens = 0
+        for text, encoding in zip(texts, encodings):
+            n_tokens = len(encoding.ids)
+            if batch and (len(batch) >= batch_size or batch_tokens + n_tokens > max_tokens):
+                batches.append(batch)
+                batch = []
+                batch_tokens = 0
+            batch.append(text)
+            batch_tokens += n_tokens
+        batches.append(batch)
+        return batches
+
+    def _embed_batches(self, texts: List[str]) -> Iterator[Tuple[int, List[List[float]]]]:
+        """
+        Yield (offset, embeddings) per packed batch as responses arrive
+
+        Batches are packed to a token budget rather than a fixed count,
+        then submitted with bounded concurrency so OCI round-trip gaps
+        overlap instead of adding up; each result is tagged with its
+        offset into texts so callers can reassemble input order. Request
+        starts stay 100ms apart (the old per-batch sleep) without
+        serializing the waits for responses.
+        """
+        batches = self._pack_batches(texts)
+        if not batches:
+            return
+
+        offsets = []
+        offset = 0
+        for batch in batches:
+            offsets.append(offset)
+            offset += len(batch)
+
+        submit_lock = threading.Lock()
+        next_start = [0.0]
+
+        def embed_batch(batch: List[str]) -> List[List[float]]:
+            with submit_lock:
+                now = time.monotonic()
+                delay = next_start[0] - now
+                next_start[0] = max(next_start[0], now) + 0.1
+            if delay > 0:
+                time.sleep(delay)
+            return self.embed_model.get_text_embedding_batch(batch)
+
+        max_workers = min(self.config.documents.max_concurrent_batches, len(batches))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(embed_batch, batch): batch_offset
+                for batch, batch_offset in zip(batches, offsets)
+            }
+            # Updates at most once a second; per-iteration terminal
+            # writes are pure overhead next to the network calls
+            for future in tqdm(as_completed(futures), total=len(batches),
+                               desc="Computing embeddings", mininterval=1.0):
+                yield futures[future], future.result()
+
+    def compute_embeddings(self, texts: List[str]) -> np.ndarray:
+        """
+        Compute embeddings for texts as an (N, dim) array
+
+        One packed array replaces N lists of Python floats, and its rows
+        bind directly to the VECTOR column in save_chunks.
+        """
+        embeddings = None
+        for offset, batch_embeddings in self._embed_batches(texts):
+            if embeddings is None:
+                # Dimension comes from the first response, dtype from
+                # the model config
+                dim = len(batch_embeddings[0])
+                embeddings = np.empty((len(texts), dim), dtype=self.db_manager.np_dtype)
+            embeddings[offset:offset + len(batch_embeddings)] = batch_embeddings
+
+        if embeddings is None:
+            return np.empty((0, 0), dtype=self.db_manager.np_dtype)
+
         logger.info(f"Computed {len(embeddings)} embeddings")
         return embeddings
     
-    def process_document(self, file_path: str) -> dict:
+    def prepare_document(self, file_path: str, existing_docs: set = None,
+                         existing_chunk_ids: set = None):
         """
-        Process a single document
-        
+        Load and chunk a single document without embedding it
+
+        Args:
+            file_path: Path to the document
+            existing_docs: Known document names; fetched when None so
+                directory runs can share one lookup across files
+            existing_chunk_ids: Known chunk IDs for the dedup check,
+                shared the same way; the IDs this document keeps are
+                added to the set so later files dedup against them too
+
         Returns:
-            dict with processing statistics
+            Tuple of (texts, ids, page_nums), or None if the document
+            already exists in the database
         """
-        start_time = time.time()
         document_name = os.path.basename(file_path)
-        
+
         logger.info(f"Processing document: {document_name}")
-        
+        self._progress(f"Processing {document_name}...")
+
         # Check if already processed
-        existing_docs = self.db_manager.get_existing_documents()
+        if existing_docs is None:
+            existing_docs = self.db_manager.get_existing_documents()
         if document_name in existing_docs:
             logger.warning(f"Document {document_name} already exists in database")
-            return {"status": "skipped", "reason": "already_exists"}
-        
+            return None
+
         # Process based on chunking setting
         if self.config.rag.chunking_enabled:
             logger.info(f"Chunking enabled (size: {self.config.rag.max_chunk_size})")
@@ -196,15 +422,93 @@ class DocumentProcessor:
         else:
             logger.info("Processing as pages")
             texts, ids, page_nums = self.process_as_pages(file_path)
-        
-        # Compute embeddings
-        embeddings = self.compute_embeddings(texts)
-        
-        # Register document
+
+        # HASH/BLAKE3 ids digest the chunk text, so they double as a
+        # content-addressed dedup key: chunks already in the database
+        # (e.g. from a renamed copy of the same file) are dropped here
+        # and never hit the embedding API
+        if self.config.documents.id_generation_method in ("HASH", "BLAKE3"):
+            if existing_chunk_ids is None:
+                existing_chunk_ids = self.db_manager.get_existing_chunk_ids()
+            kept = [i for i, chunk_id in enumerate(ids) if chunk_id not in existing_chunk_ids]
+            if len(kept) < len(ids):
+                logger.info(f"Skipping {len(ids) - len(kept)} chunks already in database")
+                texts = [texts[i] for i in kept]
+                ids = [ids[i] for i in kept]
+                page_nums = [page_nums[i] for i in kept]
+            # Later files in the same batch dedup against these chunks
+            # before anything is inserted
+            existing_chunk_ids.update(ids)
+
+        return texts, ids, page_nums
+
+    def _embed_and_save(self, texts: List[str], ids: List[str],
+                        page_nums: List[str], doc_id: int) -> int:
+        """
+        Overlap embedding round-trips with database writes
+
+        Embedding batches feed a bounded queue as they return; a writer
+        thread drains it into save_chunks, so wall time approaches
+        max(embed, insert) instead of their sum. Returns the number of
+        rows that failed to insert.
+        """
+        write_queue = queue.Queue(maxsize=4)
+        error_count = [0]
+        write_failure = [None]
+
+        def writer():
+            while True:
+                item = write_queue.get()
+                if item is None:
+                    return
+                if write_failure[0] is not None:
+                    continue  # drain so the producer never blocks
+                offset, embeddings = item
+                end = offset + len(embeddings)
+                try:
+                    error_count[0] += self.db_manager.save_chunks(
+                        ids[offset:end], texts[offset:end],
+                        page_nums[offset:end], embeddings, doc_id
+                    )
+                except Exception as e:
+                    write_failure[0] = e
+
+        writer_thread = threading.Thread(target=writer)
+        writer_thread.start()
+        try:
+            for offset, batch_embeddings in self._embed_batches(texts):
+                vectors = np.asarray(batch_embeddings, dtype=self.db_manager.np_dtype)
+                write_queue.put((offset, vectors))
+        finally:
+            write_queue.put(None)
+            writer_thread.join()
+
+        if write_failure[0] is not None:
+            raise write_failure[0]
+        return error_count[0]
+
+    def process_document(self, file_path: str, existing_docs: set = None,
+                         existing_chunk_ids: set = None) -> dict:
+        """
+        Process a single document
+
+        Returns:
+            dict with processing statistics
+        """
+        start_time = time.time()
+        document_name = os.path.basename(file_path)
+
+        prepared = self.prepare_document(file_path, existing_docs, existing_chunk_ids)
+        if prepared is None:
+            return {"status": "skipped", "reason": "already_exists"}
+        texts, ids, page_nums = prepared
+
+        # Register first so chunks can stream into the database while
+        # later embedding batches are still in flight
         doc_id = self.db_manager.register_document(document_name)
-        
-        # Save to database
-        errors = self.db_manager.save_chunks(ids, texts, page_nums, embeddings, doc_id)
+
+        self._progress(f"Embedding and saving {len(texts)} chunks from {document_name}...")
+        errors = self._embed_and_save(texts, ids, page_nums, doc_id)
         
         elapsed = time.time() - start_time
         
@@ -242,18 +546,24 @@ class DocumentProcessor:
         
         results = []
         total_chunks = 0
-        
+
+        # One round-trip each covers the already-processed check and the
+        # chunk dedup for every file; both sets are updated locally as
+        # files are prepared and saved
+        existing_docs = self.db_manager.get_existing_documents()
+        existing_chunk_ids = None
+        if self.config.documents.id_generation_method in ("HASH", "BLAKE3"):
+            existing_chunk_ids = self.db_manager.get_existing_chunk_ids()
+
+        # Phase 1: load and chunk every file up front
+        prepared = []
         for file_path in files:
             try:
-                result = self.process_document(str(file_path))
-                results.append(result)
-                
-                if result["status"] == "success":
-                    total_chunks += result["chunks"]
-                    # Move to processed directory
-                    shutil.move(str(file_path), str(processed_dir / file_path.name))
-                    logger.info(f"Moved {file_path.name} to processed directory")
-                    
+                prep = self.prepare_document(str(file_path), existing_docs, existing_chunk_ids)
+                if prep is None:
+                    results.append({"status": "skipped", "reason": "already_exists"})
+                else:
+                    prepared.append((file_path, prep))
             except Exception as e:
                 logger.error(f"Error processing {file_path.name}: {e}")
                 results.append({
@@ -261,7 +571,61 @@ class DocumentProcessor:
                     "document_name": file_path.name,
                     "error": str(e)
                 })
-        
+
+        # Phase 2: embed chunks from all files in one batched pass so
+        # OCI can batch server-side instead of one pass per file
+        all_texts = [text for _, (texts, _, _) in prepared for text in texts]
+        all_embeddings = self.compute_embeddings(all_texts) if all_texts else []
+
+        # Phase 3: register and save each document, slicing its embeddings.
+        # File moves are disk-bound, so they run on a small pool instead
+        # of blocking the next document's insert; shutil.move is a single
+        # rename when source and destination share a filesystem
+        move_pool = ThreadPoolExecutor(max_workers=2)
+        move_futures = []
+        offset = 0
+        for file_path, (texts, ids, page_nums) in prepared:
+            start_time = time.time()
+            embeddings = all_embeddings[offset:offset + len(texts)]
+            offset += len(texts)
+
+            try:
+                doc_id = self.db_manager.register_document(file_path.name)
+                self._progress(f"Inserting {len(texts)} chunks into database...")
+                errors = self.db_manager.save_chunks(ids, texts, page_nums, embeddings, doc_id)
+
+                results.append({
+                    "status": "success",
+                    "document_name": file_path.name,
+                    "chunks": len(texts),
+                    "errors": errors,
+                    "elapsed_time": time.time() - start_time
+                })
+                total_chunks += len(texts)
+                existing_docs.add(file_path.name)
+
+                # Move to processed directory in the background
+                move_futures.append(move_pool.submit(
+                    shutil.move, str(file_path), str(processed_dir / file_path.name)
+                ))
+
+            except Exception as e:
+                logger.error(f"Error processing {file_path.name}: {e}")
+                results.append({
+                    "status": "error",
+                    "document_name": file_path.name,
+                    "error": str(e)
+                })
+
+        # Settle outstanding moves before reporting; a failed move does
+        # not undo the saved chunks, it just leaves the file in place
+        for future in move_futures:
+            try:
+                future.result()
+            except OSError as e:
+                logger.error(f"Error moving processed file: {e}")
+        move_pool.shutdown()
+
         summary = {
             "total_files": len(files),
             "successful": sum(1 for r in results if r["status"] == "success"),
@@ -275,13 +639,28 @@ class DocumentProcessor:
         return summary
 
 
+def process(progress_cb=None) -> dict:
+    """
+    Process all documents in the upload directory in-process
+
+    Args:
+        progress_cb: Optional callable invoked with progress messages
+
+    Returns:
+        dict with processing summary
+    """
+    config = get_config()
+    processor = DocumentProcessor(progress_cb=progress_cb)
+    return processor.process_directory(config.documents.upload_dir)
+
+
 def main():
     """Main entry point for document processing"""
     config = get_config()
     processor = DocumentProcessor()
-    
+
     upload_dir = config.documents.upload_dir
-    
+
     logger.info("=" * 60)
     logger.info("Starting Document Processing")
     logger.info("=" * 60)